@@ -7,13 +7,21 @@
 """
 
 import os
-import json
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
-from typing import Dict, Any
+import sys
+import io
+import logging
+import math
+import asyncio
+import functools
+import httpx
+import numpy as np
+import orjson
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, Awaitable, Callable, Mapping, Optional
+from urllib.parse import urlparse
+from zoneinfo import ZoneInfo
 import time
 
 # ============================================
@@ -26,465 +34,537 @@ FRED_API_KEY = os.environ.get("FRED_API_KEY", "")
 EMAIL_ADDRESS = os.environ.get("EMAIL_ADDRESS", "")
 EMAIL_PASSWORD = os.environ.get("EMAIL_PASSWORD", "")
 
+# Console output; main() buffers it and writes it out once at the end
+log = logging.getLogger("crypto_dashboard")
+
+# Report timestamps: German local time, CET/CEST per DST
+REPORT_TZ = ZoneInfo("Europe/Berlin")
+
+HTTP_TIMEOUT = httpx.Timeout(15.0)
+HTTP_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "crypto-dashboard/5",
+}
+HTTP_LIMITS = httpx.Limits(max_connections=8, max_keepalive_connections=8)
+MAX_REQUESTS_PER_HOST = 2
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 30
+
+# Per-host request rate limits: host -> (requests per second, burst).
+# Hosts not listed are only bounded by MAX_REQUESTS_PER_HOST.
+RATE_LIMITS = {
+    "api.coingecko.com": (50 / 60, 5),
+}
+
+# API endpoints and their fixed query params (read-only, shared by every call)
+COINGECKO_BASE = "https://api.coingecko.com/api/v3"
+CG_MARKETS_URL = f"{COINGECKO_BASE}/coins/markets"
+CG_SIMPLE_PRICE_URL = f"{COINGECKO_BASE}/simple/price"
+CG_GLOBAL_URL = f"{COINGECKO_BASE}/global"
+FEAR_GREED_URL = "https://api.alternative.me/fng/"
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+BINANCE_FUNDING_URL = "https://fapi.binance.com/fapi/v1/fundingRate"
+UPBIT_TICKER_URL = "https://api.upbit.com/v1/ticker"
+FX_USD_URL = "https://api.exchangerate-api.com/v4/latest/USD"
+
+CG_MARKETS_PARAMS = MappingProxyType({
+    "vs_currency": "usd",
+    "ids": "bitcoin,ethereum,tether,usd-coin",
+    "price_change_percentage": "24h,7d",
+    "sparkline": "false",
+})
+CG_KRW_PARAMS = MappingProxyType({
+    "ids": "bitcoin,ethereum",
+    "vs_currencies": "krw",
+})
+FEAR_GREED_PARAMS = MappingProxyType({"limit": 7})
+FRED_M2_PARAMS = MappingProxyType({
+    "series_id": "M2SL",
+    "api_key": FRED_API_KEY,
+    "file_type": "json",
+    "sort_order": "desc",
+    "limit": 13,
+})
+FUNDING_PARAMS = MappingProxyType({"symbol": "BTCUSDT", "limit": 1})
+UPBIT_PARAMS = MappingProxyType({"markets": "KRW-BTC"})
+
+# On-disk response cache: seconds each payload stays fresh
+CACHE_DIR = "cache"
+CACHE_TTL = {
+    "m2": 24 * 3600,        # monthly FRED series
+    "fx_usd": 3600,         # source refreshes hourly at most
+    "fear_greed": 3600,     # daily index
+    "dominance": 600,
+}
+
+# Daily price history: rolling window kept in cache/<coin>_prices.npy
+HISTORY_DAYS = 365
+HISTORY_MAX_AGE_DAYS = 7
+
 # ============================================
 # TRAFFIC LIGHT FUNCTIONS
 # ============================================
 
-def get_ma_signal(distance: float) -> str:
-    """120D MA distance
-    🟢 +5% or higher (healthy above MA)
-    🟡 -5% to +5% (near MA)
-    🔴 -5% or lower (danger below MA)
-    """
-    if distance is None:
+# Per indicator: (light, low, high) bands checked in order, bounds inclusive.
+# A value outside every band is 🔴; a missing value is ⚪.
+SIGNAL_BANDS = {
+    # 120D MA distance: 🟢 +5%↑ (healthy above MA), 🟡 ±5%, 🔴 -5%↓
+    "ma": (("🟢", 5, math.inf), ("🟡", -5, math.inf)),
+    # vs 52-week high: 🟢 within -15%, 🟡 to -40%, 🔴 further
+    "52w_high": (("🟢", -15, math.inf), ("🟡", -40, math.inf)),
+    # vs 52-week low: 🟢 +100%↑, 🟡 +30%↑, 🔴 near the low
+    "52w_low": (("🟢", 100, math.inf), ("🟡", 30, math.inf)),
+    # Fear & Greed: 🟢 ≤25 (extreme fear = opportunity), 🟡 26-74, 🔴 ≥75
+    "fear_greed": (("🟢", -math.inf, 25), ("🟡", -math.inf, 74)),
+    # Kimchi premium %: 🟢 -1~2, 🟡 -3~5, 🔴 outside
+    "kimchi": (("🟢", -1, 2), ("🟡", -3, 5)),
+    # Funding rate %: 🟢 -0.01~0.03, 🟡 -0.03~0.08, 🔴 overheated/oversold
+    "funding": (("🟢", -0.01, 0.03), ("🟡", -0.03, 0.08)),
+    # BTC dominance %: 🟢 50-60 (balanced), 🟡 45-65, 🔴 outside
+    "dominance": (("🟢", 50, 60), ("🟡", 45, 65)),
+    # US M2 YoY %: 🟢 >5 (expansion), 🟡 0-5, 🔴 <0 (contraction)
+    "m2": (("🟢", math.nextafter(5, math.inf), math.inf), ("🟡", 0, math.inf)),
+    # Stablecoin market cap $B: 🟢 >200, 🟡 150-200, 🔴 <150
+    "stablecoin": (("🟢", math.nextafter(200, math.inf), math.inf), ("🟡", 150, math.inf)),
+}
+
+
+def get_signal(indicator: str, value: float) -> str:
+    """Traffic light for an indicator value, per SIGNAL_BANDS"""
+    if value is None:
         return "⚪"
-    if distance >= 5:
-        return "🟢"
-    elif distance >= -5:
-        return "🟡"
-    else:
-        return "🔴"
+    for light, low, high in SIGNAL_BANDS[indicator]:
+        if low <= value <= high:
+            return light
+    return "🔴"
 
 
-def get_52w_high_signal(change: float) -> str:
-    """52-week high distance
-    🟢 within -15% (near high)
-    🟡 -15% to -40%
-    🔴 -40% or lower (far from high)
-    """
-    if change is None:
-        return "⚪"
-    if change >= -15:
-        return "🟢"
-    elif change >= -40:
-        return "🟡"
-    else:
-        return "🔴"
+# ============================================
+# DATA COLLECTION
+# ============================================
 
+class TokenBucket:
+    """Async token bucket: `rate` requests/second sustained, up to `burst` at once"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
 
-def get_52w_low_signal(change: float) -> str:
-    """52-week low distance
-    🟢 +100% or higher (far from low)
-    🟡 +30% to +100%
-    🔴 +30% or lower (near low)
-    """
-    if change is None:
-        return "⚪"
-    if change >= 100:
-        return "🟢"
-    elif change >= 30:
-        return "🟡"
-    else:
-        return "🔴"
 
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+_host_buckets: Dict[str, TokenBucket] = {}
 
-def get_fear_greed_signal(value: int) -> str:
-    """Fear & Greed Index
-    🟢 ≤25 (extreme fear = opportunity)
-    🟡 26-74 (neutral)
-    🔴 ≥75 (extreme greed = caution)
-    """
-    if value is None:
-        return "⚪"
-    if value <= 25:
-        return "🟢"
-    elif value <= 74:
-        return "🟡"
-    else:
-        return "🔴"
 
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    """Per-host concurrency limit (replaces the old sleep-based pacing)"""
+    host = urlparse(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(MAX_REQUESTS_PER_HOST)
+    return _host_semaphores[host]
 
-def get_kimchi_signal(premium: float) -> str:
-    """Kimchi Premium
-    🟢 -1% to 2% (normal)
-    🟡 2%-5% or -1% to -3%
-    🔴 >5% or <-3%
-    """
-    if premium is None:
-        return "⚪"
-    if -1 <= premium <= 2:
-        return "🟢"
-    elif -3 <= premium <= 5:
-        return "🟡"
-    else:
-        return "🔴"
 
+async def _throttle(url: str) -> None:
+    """Wait for a token from the host's bucket, if RATE_LIMITS has one"""
+    host = urlparse(url).netloc
+    if host not in RATE_LIMITS:
+        return
+    if host not in _host_buckets:
+        _host_buckets[host] = TokenBucket(*RATE_LIMITS[host])
+    await _host_buckets[host].acquire()
 
-def get_funding_signal(rate: float) -> str:
-    """Funding Rate (%)
-    🟢 -0.01% to 0.03% (normal)
-    🟡 0.03% to 0.08% or -0.01% to -0.03%
-    🔴 >0.08% or <-0.03% (overheated/oversold)
-    """
-    if rate is None:
-        return "⚪"
-    if -0.01 <= rate <= 0.03:
-        return "🟢"
-    elif -0.03 <= rate <= 0.08:
-        return "🟡"
-    else:
-        return "🔴"
 
+# Errors a fetcher degrades on (report shows N/A) instead of failing the run
+FETCH_ERRORS = (httpx.HTTPError, ValueError, KeyError, IndexError)
+
+# Wall time of each fetcher's last run, by label
+FETCH_SECONDS: Dict[str, float] = {}
 
-def get_dominance_signal(dom: float) -> str:
-    """BTC Dominance
-    🟢 50%-60% (balanced)
-    🟡 45%-50% or 60%-65%
-    🔴 <45% or >65%
-    """
-    if dom is None:
-        return "⚪"
-    if 50 <= dom <= 60:
-        return "🟢"
-    elif 45 <= dom <= 65:
-        return "🟡"
-    else:
-        return "🔴"
 
+def _describe_error(e: Exception) -> str:
+    """Loggable summary of a fetch error
 
-def get_m2_signal(yoy: float) -> str:
-    """US M2 YoY
-    🟢 >5% (liquidity expansion)
-    🟡 0%-5%
-    🔴 <0% (liquidity contraction)
+    HTTP errors name only the host and path: the query string can carry an
+    API key (FRED), and httpx's own message includes the full URL.
     """
-    if yoy is None:
-        return "⚪"
-    if yoy > 5:
-        return "🟢"
-    elif yoy >= 0:
-        return "🟡"
-    else:
-        return "🔴"
+    if isinstance(e, httpx.HTTPStatusError):
+        url = e.request.url
+        return f"HTTP {e.response.status_code} from {url.host}{url.path}"
+    if isinstance(e, httpx.RequestError):
+        url = e.request.url
+        return f"{type(e).__name__} on {url.host}{url.path}"
+    return str(e)
+
+
+def safe_fetch(label: str, icon: str = "❌"):
+    """Wrap a fetcher: time it into FETCH_SECONDS, log FETCH_ERRORS and return {}"""
+    def decorator(fetcher):
+        @functools.wraps(fetcher)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fetcher(*args, **kwargs)
+            except FETCH_ERRORS as e:
+                log.warning(f"{icon} {label} fetch failed: {_describe_error(e)}")
+                return {}
+            finally:
+                FETCH_SECONDS[label] = time.perf_counter() - start
+        return wrapper
+    return decorator
+
+
+def _retry_after(response: httpx.Response) -> float:
+    """Seconds from a numeric Retry-After header (capped), else 0"""
+    value = response.headers.get("Retry-After", "")
+    return min(float(value), MAX_RETRY_AFTER) if value.isdigit() else 0
+
+
+async def fetch_json(client: httpx.AsyncClient, url: str, params: Optional[Mapping[str, Any]] = None) -> Any:
+    """GET a URL and decode the JSON body
+
+    429/5xx responses and connection errors are retried with exponential
+    backoff, or after the server's Retry-After when it sends one.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        last = attempt == MAX_RETRIES
+        delay = RETRY_BACKOFF * 2 ** attempt
+        await _throttle(url)
+        try:
+            async with _host_semaphore(url):
+                response = await client.get(url, params=params)
+        except httpx.TransportError:
+            if last:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or last:
+                response.raise_for_status()
+                return orjson.loads(response.content)
+            delay = _retry_after(response) or delay
+        await asyncio.sleep(delay)
 
 
-def get_stablecoin_signal(total_b: float) -> str:
-    """Stablecoin Market Cap
-    🟢 >$200B
-    🟡 $150B-$200B
-    🔴 <$150B
+async def cached(key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Serve cache/<key>.json while younger than CACHE_TTL[key], else fetch and store"""
+    ttl = CACHE_TTL[key]
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, "rb") as f:
+            entry = orjson.loads(f.read())
+        if time.time() - entry["fetched_at"] < ttl:
+            return entry["payload"]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    payload = await fetch()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps({"fetched_at": time.time(), "payload": payload}))
+    return payload
+
+
+async def get_price_history(client: httpx.AsyncClient, coin_id: str) -> np.ndarray:
+    """Daily [timestamp_ms, price] rows for the last HISTORY_DAYS
+
+    The first run (or a cache older than HISTORY_MAX_AGE_DAYS) downloads the
+    full window; later runs only fetch the days since the last stored bar and
+    splice them in.
     """
-    if total_b is None:
-        return "⚪"
-    if total_b > 200:
-        return "🟢"
-    elif total_b >= 150:
-        return "🟡"
+    url = f"{COINGECKO_BASE}/coins/{coin_id}/market_chart"
+    path = os.path.join(CACHE_DIR, f"{coin_id}_prices.npy")
+    try:
+        history = np.load(path)
+        age_days = (time.time() - history[-1, 0] / 1000) / 86400
+    except (OSError, ValueError, IndexError):
+        history, age_days = None, HISTORY_DAYS
+    
+    if age_days > HISTORY_MAX_AGE_DAYS:
+        days = HISTORY_DAYS
     else:
-        return "🔴"
-
+        days = int(age_days) + 2
+    params = {"vs_currency": "usd", "days": str(days), "interval": "daily"}
+    chart = await fetch_json(client, url, params)
+    fresh = np.asarray(chart.get("prices", []), dtype=np.float64).reshape(-1, 2)
+    
+    if days < HISTORY_DAYS:
+        # The fetched bars replace everything from their first timestamp on,
+        # including the previous run's intraday "latest" point; an empty
+        # delta keeps the stored history
+        if fresh.size:
+            history = np.concatenate([history[history[:, 0] < fresh[0, 0]], fresh])
+    else:
+        history = fresh
+    
+    if history.size:
+        history = history[history[:, 0] >= history[-1, 0] - HISTORY_DAYS * 86400 * 1000]
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.save(path, history)
+    return history
 
-# ============================================
-# DATA COLLECTION
-# ============================================
 
-def get_btc_detailed() -> Dict[str, Any]:
-    """BTC detailed data"""
+async def get_krw_prices(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """BTC/ETH KRW prices; optional, so a failure only zeroes price_krw"""
     try:
-        url = "https://api.coingecko.com/api/v3/coins/bitcoin"
-        params = {
-            "localization": "false",
-            "tickers": "false",
-            "community_data": "false",
-            "developer_data": "false"
-        }
-        response = requests.get(url, params=params, timeout=15)
-        data = response.json()
-        market_data = data.get("market_data", {})
-        
-        current_price = market_data.get("current_price", {}).get("usd", 0)
-        
-        result = {
-            "price_usd": current_price,
-            "price_krw": market_data.get("current_price", {}).get("krw", 0),
-            "change_24h": market_data.get("price_change_percentage_24h", 0),
-            "change_7d": market_data.get("price_change_percentage_7d", 0),
-        }
-        
-        time.sleep(1)
-        history_url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
-        history_params = {"vs_currency": "usd", "days": "365", "interval": "daily"}
-        history_response = requests.get(history_url, params=history_params, timeout=15)
-        prices = [p[1] for p in history_response.json().get("prices", [])]
-        
-        if prices:
-            high_52w = max(prices)
-            low_52w = min(prices)
-            result["high_52w"] = high_52w
-            result["low_52w"] = low_52w
-            result["from_52w_high"] = ((current_price - high_52w) / high_52w * 100)
-            result["from_52w_low"] = ((current_price - low_52w) / low_52w * 100)
-            
-            if len(prices) >= 120:
-                ma_120 = sum(prices[-120:]) / 120
-                result["ma_120"] = ma_120
-                result["ma_120_distance"] = ((current_price - ma_120) / ma_120 * 100)
-        
-        return result
-    except Exception as e:
-        print(f"❌ BTC fetch failed: {e}")
+        return await fetch_json(client, CG_SIMPLE_PRICE_URL, CG_KRW_PARAMS)
+    except FETCH_ERRORS as e:
+        log.warning(f"⚠️ KRW prices fetch failed: {_describe_error(e)}")
         return {}
 
 
-def get_eth_detailed() -> Dict[str, Any]:
-    """ETH detailed data"""
-    try:
-        url = "https://api.coingecko.com/api/v3/coins/ethereum"
-        params = {
-            "localization": "false",
-            "tickers": "false",
-            "community_data": "false",
-            "developer_data": "false"
-        }
-        response = requests.get(url, params=params, timeout=15)
-        data = response.json()
-        market_data = data.get("market_data", {})
-        
-        current_price = market_data.get("current_price", {}).get("usd", 0)
-        
-        result = {
-            "price_usd": current_price,
-            "price_krw": market_data.get("current_price", {}).get("krw", 0),
-            "change_24h": market_data.get("price_change_percentage_24h", 0),
-            "change_7d": market_data.get("price_change_percentage_7d", 0),
+async def get_markets(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """BTC, ETH and stablecoin quotes in one CoinGecko markets call (plus KRW)"""
+    markets, krw = await asyncio.gather(
+        fetch_json(client, CG_MARKETS_URL, CG_MARKETS_PARAMS),
+        get_krw_prices(client),
+    )
+    return {
+        coin["id"]: {
+            "price_usd": coin.get("current_price", 0),
+            "price_krw": krw.get(coin["id"], {}).get("krw", 0),
+            "change_24h": coin.get("price_change_percentage_24h", 0),
+            "change_7d": coin.get("price_change_percentage_7d_in_currency", 0),
+            "market_cap": coin.get("market_cap") or 0,
         }
+        for coin in markets
+    }
+
+
+async def get_coin_detailed(client: httpx.AsyncClient, markets: Awaitable[Dict[str, Any]], coin_id: str) -> Dict[str, Any]:
+    """Spot quote (from the shared markets task) plus 52w range and 120D MA for coin_id"""
+    quotes, history = await asyncio.gather(
+        markets,
+        get_price_history(client, coin_id),
+    )
+    result = dict(quotes[coin_id])
+    current_price = result["price_usd"]
+    
+    prices = history[:, 1]
+    
+    if prices.size:
+        high_52w = float(prices.max())
+        low_52w = float(prices.min())
+        result["high_52w"] = high_52w
+        result["low_52w"] = low_52w
+        result["from_52w_high"] = ((current_price - high_52w) / high_52w * 100)
+        result["from_52w_low"] = ((current_price - low_52w) / low_52w * 100)
         
-        time.sleep(1)
-        history_url = "https://api.coingecko.com/api/v3/coins/ethereum/market_chart"
-        history_params = {"vs_currency": "usd", "days": "365", "interval": "daily"}
-        history_response = requests.get(history_url, params=history_params, timeout=15)
-        prices = [p[1] for p in history_response.json().get("prices", [])]
-        
-        if prices:
-            high_52w = max(prices)
-            low_52w = min(prices)
-            result["high_52w"] = high_52w
-            result["low_52w"] = low_52w
-            result["from_52w_high"] = ((current_price - high_52w) / high_52w * 100)
-            result["from_52w_low"] = ((current_price - low_52w) / low_52w * 100)
-            
-            if len(prices) >= 120:
-                ma_120 = sum(prices[-120:]) / 120
-                result["ma_120"] = ma_120
-                result["ma_120_distance"] = ((current_price - ma_120) / ma_120 * 100)
-        
-        return result
-    except Exception as e:
-        print(f"❌ ETH fetch failed: {e}")
-        return {}
+        if prices.size >= 120:
+            ma_120 = float(prices[-120:].mean())
+            result["ma_120"] = ma_120
+            result["ma_120_distance"] = ((current_price - ma_120) / ma_120 * 100)
+    
+    return result
 
 
-def get_fear_greed_index() -> Dict[str, Any]:
+@safe_fetch("BTC")
+async def get_btc_detailed(client: httpx.AsyncClient, markets: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """BTC detailed data"""
+    return await get_coin_detailed(client, markets, "bitcoin")
+
+
+@safe_fetch("ETH")
+async def get_eth_detailed(client: httpx.AsyncClient, markets: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """ETH detailed data"""
+    return await get_coin_detailed(client, markets, "ethereum")
+
+
+@safe_fetch("Fear & Greed")
+async def get_fear_greed_index(client: httpx.AsyncClient) -> Dict[str, Any]:
     """Fear & Greed Index"""
-    try:
-        url = "https://api.alternative.me/fng/"
-        params = {"limit": 7}
-        response = requests.get(url, params=params, timeout=15)
-        data = response.json().get("data", [])
-        
-        if data:
-            current = data[0]
-            yesterday = data[1] if len(data) > 1 else current
-            return {
-                "value": int(current.get("value", 0)),
-                "classification": current.get("value_classification", ""),
-                "yesterday": int(yesterday.get("value", 0)),
-            }
-    except Exception as e:
-        print(f"❌ Fear & Greed fetch failed: {e}")
+    data = (await cached("fear_greed", lambda: fetch_json(client, FEAR_GREED_URL, FEAR_GREED_PARAMS))).get("data", [])
+    
+    if data:
+        current = data[0]
+        yesterday = data[1] if len(data) > 1 else current
+        return {
+            "value": int(current.get("value", 0)),
+            "classification": current.get("value_classification", ""),
+            "yesterday": int(yesterday.get("value", 0)),
+        }
     return {}
 
 
-def get_us_m2_supply() -> Dict[str, Any]:
+def _fred_value(observation: Dict[str, Any]) -> float:
+    """Observation value as a float; FRED's "." (missing) becomes NaN"""
+    try:
+        return float(observation["value"])
+    except (KeyError, ValueError):
+        return math.nan
+
+
+@safe_fetch("US M2")
+async def get_us_m2_supply(client: httpx.AsyncClient) -> Dict[str, Any]:
     """FRED API - US M2"""
     if not FRED_API_KEY:
         return {}
     
-    try:
-        url = "https://api.stlouisfed.org/fred/series/observations"
-        params = {
-            "series_id": "M2SL",
-            "api_key": FRED_API_KEY,
-            "file_type": "json",
-            "sort_order": "desc",
-            "limit": 13,
-        }
-        response = requests.get(url, params=params, timeout=15)
-        data = response.json().get("observations", [])
+    data = (await cached("m2", lambda: fetch_json(client, FRED_OBSERVATIONS_URL, FRED_M2_PARAMS))).get("observations", [])
+    
+    if len(data) >= 2:
+        # Newest first: [0] is this month, [12] the same month a year ago
+        values = np.fromiter((_fred_value(o) for o in data), dtype=np.float64, count=len(data))
+        current = values[0]
+        if np.isnan(current):
+            return {}
+        year_ago = values[12] if values.size > 12 else current
         
-        if len(data) >= 2:
-            current = float(data[0].get("value", 0))
-            year_ago = float(data[12].get("value", current)) if len(data) > 12 else current
-            
-            return {
-                "value_trillions": current / 1000,
-                "yoy_change": ((current - year_ago) / year_ago * 100) if year_ago else 0,
-            }
-    except Exception as e:
-        print(f"❌ M2 fetch failed: {e}")
+        result = {"value_trillions": float(current) / 1000}
+        # A missing year-ago month leaves YoY out (⚪) rather than faking 0%
+        if not np.isnan(year_ago):
+            result["yoy_change"] = float((current - year_ago) / year_ago * 100) if year_ago else 0
+        return result
     return {}
 
 
-def get_funding_rate() -> Dict[str, Any]:
+@safe_fetch("Funding Rate")
+async def get_funding_rate(client: httpx.AsyncClient) -> Dict[str, Any]:
     """Binance Funding Rate"""
-    try:
-        url = "https://fapi.binance.com/fapi/v1/fundingRate"
-        params = {"symbol": "BTCUSDT", "limit": 1}
-        response = requests.get(url, params=params, timeout=15)
-        data = response.json()
-        
-        if data:
-            rate = float(data[0].get("fundingRate", 0))
-            return {"rate_percent": rate * 100}
-    except Exception as e:
-        print(f"❌ Funding Rate fetch failed: {e}")
+    data = await fetch_json(client, BINANCE_FUNDING_URL, FUNDING_PARAMS)
+    
+    if data:
+        rate = float(data[0].get("fundingRate", 0))
+        return {"rate_percent": rate * 100}
     return {}
 
 
-def get_kimchi_premium() -> Dict[str, Any]:
-    """Kimchi Premium"""
-    try:
-        upbit_response = requests.get(
-            "https://api.upbit.com/v1/ticker", 
-            params={"markets": "KRW-BTC"}, 
-            timeout=15
-        )
-        upbit_price = upbit_response.json()[0].get("trade_price", 0)
-        
-        binance_response = requests.get(
-            "https://api.binance.com/api/v3/ticker/price", 
-            params={"symbol": "BTCUSDT"}, 
-            timeout=15
-        )
-        binance_price = float(binance_response.json().get("price", 0))
-        
-        fx_response = requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=15)
-        usd_krw = fx_response.json().get("rates", {}).get("KRW", 1300)
-        
-        binance_krw = binance_price * usd_krw
-        premium = ((upbit_price - binance_krw) / binance_krw * 100) if binance_krw else 0
-        
-        return {
-            "premium_percent": round(premium, 2),
-            "usd_krw": usd_krw,
-        }
-    except Exception as e:
-        print(f"❌ Kimchi Premium fetch failed: {e}")
-    return {}
-
+async def get_usd_krw(client: httpx.AsyncClient) -> float:
+    """USD/KRW rate, cached for CACHE_TTL["fx_usd"] (1300 if the source omits it)"""
+    fx = await cached("fx_usd", lambda: fetch_json(client, FX_USD_URL))
+    return fx.get("rates", {}).get("KRW", 1300)
 
-def get_btc_dominance() -> Dict[str, Any]:
-    """BTC Dominance"""
-    try:
-        url = "https://api.coingecko.com/api/v3/global"
-        response = requests.get(url, timeout=15)
-        data = response.json().get("data", {})
-        
-        return {
-            "btc_dominance": round(data.get("market_cap_percentage", {}).get("btc", 0), 1),
-        }
-    except Exception as e:
-        print(f"⚠️ Dominance fetch failed: {e}")
-    return {}
 
+@safe_fetch("Kimchi Premium")
+async def get_kimchi_premium(client: httpx.AsyncClient, btc: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Kimchi Premium
 
-def get_stablecoin_supply() -> Dict[str, Any]:
-    """Stablecoin Market Cap"""
-    try:
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            "ids": "tether,usd-coin",
-            "vs_currencies": "usd",
-            "include_market_cap": "true"
+    Upbit KRW price vs. the BTC USD price already collected by
+    get_btc_detailed (passed in as its pending task).
+    """
+    upbit, usd_krw, btc_data = await asyncio.gather(
+        fetch_json(client, UPBIT_TICKER_URL, UPBIT_PARAMS),
+        get_usd_krw(client),
+        btc,
+    )
+    upbit_price = upbit[0].get("trade_price", 0)
+    btc_usd = btc_data.get("price_usd", 0)
+    if not btc_usd:
+        return {"usd_krw": usd_krw}
+    
+    global_krw = btc_usd * usd_krw
+    premium = (upbit_price - global_krw) / global_krw * 100
+    
+    return {
+        "premium_percent": round(premium, 2),
+        "usd_krw": usd_krw,
+    }
+
+
+@safe_fetch("Dominance", icon="⚠️")
+async def get_btc_dominance(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """BTC Dominance"""
+    data = (await cached("dominance", lambda: fetch_json(client, CG_GLOBAL_URL))).get("data", {})
+    
+    return {
+        "btc_dominance": round(data.get("market_cap_percentage", {}).get("btc", 0), 1),
+    }
+
+
+@safe_fetch("Stablecoin", icon="⚠️")
+async def get_stablecoin_supply(markets: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Stablecoin Market Cap (from the shared markets task)"""
+    quotes = await markets
+    
+    usdt = quotes.get("tether", {}).get("market_cap", 0) / 1e9
+    usdc = quotes.get("usd-coin", {}).get("market_cap", 0) / 1e9
+    
+    return {"total_billions": usdt + usdc}
+
+
+async def collect_all() -> Dict[str, Any]:
+    """Run all fetchers concurrently"""
+    # HTTP/2: the CoinGecko requests multiplex over one TLS connection
+    async with httpx.AsyncClient(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS, headers=HTTP_HEADERS) as client:
+        markets = asyncio.ensure_future(get_markets(client))
+        btc = asyncio.ensure_future(get_btc_detailed(client, markets))
+        # data key -> (label, pending fetch)
+        jobs = {
+            "btc": ("BTC", btc),
+            "eth": ("ETH", get_eth_detailed(client, markets)),
+            "fear_greed": ("Fear & Greed", get_fear_greed_index(client)),
+            "m2_supply": ("US M2", get_us_m2_supply(client)),
+            "funding_rate": ("Funding Rate", get_funding_rate(client)),
+            "kimchi_premium": ("Kimchi Premium", get_kimchi_premium(client, btc)),
+            "dominance": ("Dominance", get_btc_dominance(client)),
+            "stablecoin": ("Stablecoin", get_stablecoin_supply(markets)),
         }
-        response = requests.get(url, params=params, timeout=15)
-        data = response.json()
-        
-        usdt = data.get("tether", {}).get("usd_market_cap", 0) / 1e9
-        usdc = data.get("usd-coin", {}).get("usd_market_cap", 0) / 1e9
-        
-        return {"total_billions": usdt + usdc}
-    except Exception as e:
-        print(f"⚠️ Stablecoin fetch failed: {e}")
-    return {}
+        for label, _ in jobs.values():
+            log.info(f"📊 {label}...")
+        results = await asyncio.gather(
+            *(job for _, job in jobs.values()),
+            return_exceptions=True,
+        )
+    
+    if FETCH_SECONDS:
+        slowest = max(FETCH_SECONDS, key=FETCH_SECONDS.get)
+        log.info(f"⏱️ Slowest: {slowest} ({FETCH_SECONDS[slowest]:.2f}s)")
+    
+    data = {}
+    for (key, (label, _)), result in zip(jobs.items(), results):
+        if isinstance(result, Exception):
+            log.error(f"❌ {label} fetch failed: {result}")
+            result = {}
+        data[key] = result
+    return data
 
 
 # ============================================
 # REPORT GENERATION
 # ============================================
 
-def generate_report(data: Dict[str, Any]) -> str:
-    """Generate Telegram report with traffic lights"""
-    
-    now = datetime.utcnow() + timedelta(hours=1)
-    time_str = now.strftime("%Y-%m-%d %H:%M")
-    
-    btc = data.get("btc", {})
-    eth = data.get("eth", {})
-    fg = data.get("fear_greed", {})
-    m2 = data.get("m2_supply", {})
-    fr = data.get("funding_rate", {})
-    kp = data.get("kimchi_premium", {})
-    dom = data.get("dominance", {})
-    stable = data.get("stablecoin", {})
-    
-    # BTC signals
-    btc_ma_dist = btc.get('ma_120_distance')
-    btc_ma_sig = get_ma_signal(btc_ma_dist)
-    btc_52h_sig = get_52w_high_signal(btc.get('from_52w_high'))
-    btc_52l_sig = get_52w_low_signal(btc.get('from_52w_low'))
-    
-    # ETH signals
-    eth_ma_dist = eth.get('ma_120_distance')
-    eth_ma_sig = get_ma_signal(eth_ma_dist)
-    eth_52h_sig = get_52w_high_signal(eth.get('from_52w_high'))
-    eth_52l_sig = get_52w_low_signal(eth.get('from_52w_low'))
-    
-    # Market signals
-    fg_sig = get_fear_greed_signal(fg.get('value'))
-    kp_sig = get_kimchi_signal(kp.get('premium_percent'))
-    fr_sig = get_funding_signal(fr.get('rate_percent'))
-    dom_sig = get_dominance_signal(dom.get('btc_dominance'))
-    
-    # Macro signals
-    m2_sig = get_m2_signal(m2.get('yoy_change'))
-    stable_sig = get_stablecoin_signal(stable.get('total_billions'))
-    
-    # Formatting
-    btc_ma_str = f"{btc_ma_dist:+.1f}%" if btc_ma_dist else "N/A"
-    btc_ma_price = f"${btc.get('ma_120', 0):,.0f}" if btc.get('ma_120') else "N/A"
-    eth_ma_str = f"{eth_ma_dist:+.1f}%" if eth_ma_dist else "N/A"
-    eth_ma_price = f"${eth.get('ma_120', 0):,.0f}" if eth.get('ma_120') else "N/A"
-    
-    report = f"""📊 *Crypto Dashboard v5*
-_{time_str} CET_
+# Telegram Markdown report, filled from report_context()
+REPORT_TEMPLATE = """📊 *Crypto Dashboard v5*
+_{time}_
 
 ━━━━━━━━━━━━━━━━━━━
 
-*BTC* ${btc.get('price_usd', 0):,.0f} ({btc.get('change_24h', 0):+.1f}%)
-{btc_ma_sig} 120D MA: {btc_ma_price} ({btc_ma_str})
-{btc_52h_sig} vs 52w High: {btc.get('from_52w_high', 0):.1f}%
-{btc_52l_sig} vs 52w Low: +{btc.get('from_52w_low', 0):.1f}%
+*BTC* ${btc_price:,.0f} ({btc_change_24h:+.1f}%)
+{btc_ma_sig} 120D MA: {btc_ma_price} ({btc_ma_dist})
+{btc_52h_sig} vs 52w High: {btc_from_high:.1f}%
+{btc_52l_sig} vs 52w Low: +{btc_from_low:.1f}%
 
-*ETH* ${eth.get('price_usd', 0):,.0f} ({eth.get('change_24h', 0):+.1f}%)
-{eth_ma_sig} 120D MA: {eth_ma_price} ({eth_ma_str})
-{eth_52h_sig} vs 52w High: {eth.get('from_52w_high', 0):.1f}%
-{eth_52l_sig} vs 52w Low: +{eth.get('from_52w_low', 0):.1f}%
+*ETH* ${eth_price:,.0f} ({eth_change_24h:+.1f}%)
+{eth_ma_sig} 120D MA: {eth_ma_price} ({eth_ma_dist})
+{eth_52h_sig} vs 52w High: {eth_from_high:.1f}%
+{eth_52l_sig} vs 52w Low: +{eth_from_low:.1f}%
 
 ━━━━━━━━━━━━━━━━━━━
 
 *Market Indicators*
-{fg_sig} Fear & Greed: {fg.get('value', 'N/A')} ({fg.get('classification', '')})
-{kp_sig} Kimchi Premium: {kp.get('premium_percent', 'N/A')}%
-{fr_sig} Funding Rate: {fr.get('rate_percent', 0):.4f}%
-{dom_sig} BTC Dominance: {dom.get('btc_dominance', 'N/A')}%
+{fg_sig} Fear & Greed: {fg_value} ({fg_class})
+{kp_sig} Kimchi Premium: {kp_premium}%
+{fr_sig} Funding Rate: {funding:.4f}%
+{dom_sig} BTC Dominance: {dominance}%
 
 ━━━━━━━━━━━━━━━━━━━
 
 *Macro*
-{m2_sig} US M2: ${m2.get('value_trillions', 0):.2f}T (YoY {m2.get('yoy_change', 0):+.1f}%)
-⚪ USD/KRW: {kp.get('usd_krw', 0):,.0f}
-{stable_sig} Stablecoin: ${stable.get('total_billions', 0):.0f}B
+{m2_sig} US M2: ${m2_trillions:.2f}T (YoY {m2_yoy:+.1f}%)
+⚪ USD/KRW: {usd_krw:,.0f}
+{stable_sig} Stablecoin: ${stable_billions:.0f}B
 
 ━━━━━━━━━━━━━━━━━━━
 🔗 [ETF](https://sosovalue.com/assets/etf/us-btc-spot) • [SOPR](https://charts.bgeometrics.com/lth_sopr.html) • [MVRV](https://charts.bgeometrics.com/mvrv.html) • [M2](https://charts.bgeometrics.com/m2_global.html)
@@ -505,50 +585,11 @@ _{time_str} CET_
 
 *Macro*
 • M2: 🟢YoY+5%↑ 🟡0-5% 🔴<0%
-• Stable: 🟢>$200B 🟡$150-200B 🔴<$150B
-"""
-    return report.strip()
+• Stable: 🟢>$200B 🟡$150-200B 🔴<$150B"""
 
 
-def generate_email_report(data: Dict[str, Any]) -> str:
-    """Generate HTML email report"""
-    
-    now = datetime.utcnow() + timedelta(hours=1)
-    time_str = now.strftime("%Y-%m-%d %H:%M")
-    
-    btc = data.get("btc", {})
-    eth = data.get("eth", {})
-    fg = data.get("fear_greed", {})
-    m2 = data.get("m2_supply", {})
-    fr = data.get("funding_rate", {})
-    kp = data.get("kimchi_premium", {})
-    dom = data.get("dominance", {})
-    stable = data.get("stablecoin", {})
-    
-    # Signals
-    btc_ma_dist = btc.get('ma_120_distance')
-    btc_ma_sig = get_ma_signal(btc_ma_dist)
-    btc_52h_sig = get_52w_high_signal(btc.get('from_52w_high'))
-    btc_52l_sig = get_52w_low_signal(btc.get('from_52w_low'))
-    
-    eth_ma_dist = eth.get('ma_120_distance')
-    eth_ma_sig = get_ma_signal(eth_ma_dist)
-    eth_52h_sig = get_52w_high_signal(eth.get('from_52w_high'))
-    eth_52l_sig = get_52w_low_signal(eth.get('from_52w_low'))
-    
-    fg_sig = get_fear_greed_signal(fg.get('value'))
-    kp_sig = get_kimchi_signal(kp.get('premium_percent'))
-    fr_sig = get_funding_signal(fr.get('rate_percent'))
-    dom_sig = get_dominance_signal(dom.get('btc_dominance'))
-    m2_sig = get_m2_signal(m2.get('yoy_change'))
-    stable_sig = get_stablecoin_signal(stable.get('total_billions'))
-    
-    btc_ma_str = f"{btc_ma_dist:+.1f}%" if btc_ma_dist else "N/A"
-    btc_ma_price = f"${btc.get('ma_120', 0):,.0f}" if btc.get('ma_120') else "N/A"
-    eth_ma_str = f"{eth_ma_dist:+.1f}%" if eth_ma_dist else "N/A"
-    eth_ma_price = f"${eth.get('ma_120', 0):,.0f}" if eth.get('ma_120') else "N/A"
-    
-    html = f"""
+# HTML email report, filled from report_context()
+EMAIL_TEMPLATE = """
     <html>
     <head>
         <style>
@@ -570,44 +611,44 @@ def generate_email_report(data: Dict[str, Any]) -> str:
     </head>
     <body>
         <h1>📊 Crypto Dashboard</h1>
-        <p><em>{time_str} CET</em></p>
+        <p><em>{time}</em></p>
         
         <div class="section">
-            <h2>BTC <span class="price">${btc.get('price_usd', 0):,.0f}</span> 
-            <span class="{'change-pos' if btc.get('change_24h', 0) >= 0 else 'change-neg'}">({btc.get('change_24h', 0):+.1f}%)</span></h2>
+            <h2>BTC <span class="price">${btc_price:,.0f}</span> 
+            <span class="{btc_change_class}">({btc_change_24h:+.1f}%)</span></h2>
             <table>
-                <tr><td class="signal">{btc_ma_sig}</td><td>120D MA: {btc_ma_price} ({btc_ma_str})</td></tr>
-                <tr><td class="signal">{btc_52h_sig}</td><td>vs 52w High: {btc.get('from_52w_high', 0):.1f}%</td></tr>
-                <tr><td class="signal">{btc_52l_sig}</td><td>vs 52w Low: +{btc.get('from_52w_low', 0):.1f}%</td></tr>
+                <tr><td class="signal">{btc_ma_sig}</td><td>120D MA: {btc_ma_price} ({btc_ma_dist})</td></tr>
+                <tr><td class="signal">{btc_52h_sig}</td><td>vs 52w High: {btc_from_high:.1f}%</td></tr>
+                <tr><td class="signal">{btc_52l_sig}</td><td>vs 52w Low: +{btc_from_low:.1f}%</td></tr>
             </table>
         </div>
         
         <div class="section">
-            <h2>ETH <span class="price">${eth.get('price_usd', 0):,.0f}</span>
-            <span class="{'change-pos' if eth.get('change_24h', 0) >= 0 else 'change-neg'}">({eth.get('change_24h', 0):+.1f}%)</span></h2>
+            <h2>ETH <span class="price">${eth_price:,.0f}</span>
+            <span class="{eth_change_class}">({eth_change_24h:+.1f}%)</span></h2>
             <table>
-                <tr><td class="signal">{eth_ma_sig}</td><td>120D MA: {eth_ma_price} ({eth_ma_str})</td></tr>
-                <tr><td class="signal">{eth_52h_sig}</td><td>vs 52w High: {eth.get('from_52w_high', 0):.1f}%</td></tr>
-                <tr><td class="signal">{eth_52l_sig}</td><td>vs 52w Low: +{eth.get('from_52w_low', 0):.1f}%</td></tr>
+                <tr><td class="signal">{eth_ma_sig}</td><td>120D MA: {eth_ma_price} ({eth_ma_dist})</td></tr>
+                <tr><td class="signal">{eth_52h_sig}</td><td>vs 52w High: {eth_from_high:.1f}%</td></tr>
+                <tr><td class="signal">{eth_52l_sig}</td><td>vs 52w Low: +{eth_from_low:.1f}%</td></tr>
             </table>
         </div>
         
         <div class="section">
             <h2>Market Indicators</h2>
             <table>
-                <tr><td class="signal">{fg_sig}</td><td>Fear & Greed: {fg.get('value', 'N/A')} ({fg.get('classification', '')})</td></tr>
-                <tr><td class="signal">{kp_sig}</td><td>Kimchi Premium: {kp.get('premium_percent', 'N/A')}%</td></tr>
-                <tr><td class="signal">{fr_sig}</td><td>Funding Rate: {fr.get('rate_percent', 0):.4f}%</td></tr>
-                <tr><td class="signal">{dom_sig}</td><td>BTC Dominance: {dom.get('btc_dominance', 'N/A')}%</td></tr>
+                <tr><td class="signal">{fg_sig}</td><td>Fear & Greed: {fg_value} ({fg_class})</td></tr>
+                <tr><td class="signal">{kp_sig}</td><td>Kimchi Premium: {kp_premium}%</td></tr>
+                <tr><td class="signal">{fr_sig}</td><td>Funding Rate: {funding:.4f}%</td></tr>
+                <tr><td class="signal">{dom_sig}</td><td>BTC Dominance: {dominance}%</td></tr>
             </table>
         </div>
         
         <div class="section">
             <h2>Macro</h2>
             <table>
-                <tr><td class="signal">{m2_sig}</td><td>US M2: ${m2.get('value_trillions', 0):.2f}T (YoY {m2.get('yoy_change', 0):+.1f}%)</td></tr>
-                <tr><td class="signal">⚪</td><td>USD/KRW: {kp.get('usd_krw', 0):,.0f}</td></tr>
-                <tr><td class="signal">{stable_sig}</td><td>Stablecoin: ${stable.get('total_billions', 0):.0f}B</td></tr>
+                <tr><td class="signal">{m2_sig}</td><td>US M2: ${m2_trillions:.2f}T (YoY {m2_yoy:+.1f}%)</td></tr>
+                <tr><td class="signal">⚪</td><td>USD/KRW: {usd_krw:,.0f}</td></tr>
+                <tr><td class="signal">{stable_sig}</td><td>Stablecoin: ${stable_billions:.0f}B</td></tr>
             </table>
         </div>
         
@@ -628,7 +669,86 @@ def generate_email_report(data: Dict[str, Any]) -> str:
     </body>
     </html>
     """
-    return html
+
+
+def _fmt_usd(value: float) -> str:
+    """$12,345 or N/A"""
+    return f"${value:,.0f}" if value is not None else "N/A"
+
+
+def _fmt_pct(value: float) -> str:
+    """+1.2% or N/A"""
+    return f"{value:+.1f}%" if value is not None else "N/A"
+
+
+def _coin_context(prefix: str, coin: Dict[str, Any]) -> Dict[str, Any]:
+    """Report fields for one coin's detailed data, keyed <prefix>_*"""
+    ma_dist = coin.get('ma_120_distance')
+    from_high = coin.get('from_52w_high')
+    from_low = coin.get('from_52w_low')
+    
+    return {
+        f"{prefix}_price": coin.get('price_usd', 0),
+        f"{prefix}_change_24h": coin.get('change_24h', 0),
+        f"{prefix}_ma_price": _fmt_usd(coin.get('ma_120')),
+        f"{prefix}_ma_dist": _fmt_pct(ma_dist),
+        f"{prefix}_from_high": from_high if from_high is not None else 0,
+        f"{prefix}_from_low": from_low if from_low is not None else 0,
+        f"{prefix}_ma_sig": get_signal("ma", ma_dist),
+        f"{prefix}_52h_sig": get_signal("52w_high", from_high),
+        f"{prefix}_52l_sig": get_signal("52w_low", from_low),
+    }
+
+
+def report_context(data: Dict[str, Any], time_str: str) -> Dict[str, Any]:
+    """Flatten collected data into the values and signals the reports show"""
+    fg = data.get("fear_greed", {})
+    kp = data.get("kimchi_premium", {})
+    m2 = data.get("m2_supply", {})
+    
+    # Each value is read once and shared by its display field and its signal
+    fg_value = fg.get('value')
+    premium = kp.get('premium_percent')
+    funding = data.get("funding_rate", {}).get('rate_percent')
+    dominance = data.get("dominance", {}).get('btc_dominance')
+    m2_yoy = m2.get('yoy_change')
+    stable_billions = data.get("stablecoin", {}).get('total_billions')
+    
+    return {
+        "time": time_str,
+        **_coin_context("btc", data.get("btc", {})),
+        **_coin_context("eth", data.get("eth", {})),
+        # Market
+        "fg_value": fg_value if fg_value is not None else "N/A",
+        "fg_class": fg.get('classification', ''),
+        "fg_sig": get_signal("fear_greed", fg_value),
+        "kp_premium": premium if premium is not None else "N/A",
+        "kp_sig": get_signal("kimchi", premium),
+        "funding": funding if funding is not None else 0,
+        "fr_sig": get_signal("funding", funding),
+        "dominance": dominance if dominance is not None else "N/A",
+        "dom_sig": get_signal("dominance", dominance),
+        # Macro
+        "m2_trillions": m2.get('value_trillions', 0),
+        "m2_yoy": m2_yoy if m2_yoy is not None else 0,
+        "m2_sig": get_signal("m2", m2_yoy),
+        "usd_krw": kp.get('usd_krw', 0),
+        "stable_billions": stable_billions if stable_billions is not None else 0,
+        "stable_sig": get_signal("stablecoin", stable_billions),
+    }
+
+
+def generate_report(data: Dict[str, Any], time_str: str) -> str:
+    """Generate Telegram report with traffic lights"""
+    return REPORT_TEMPLATE.format_map(report_context(data, time_str))
+
+
+def generate_email_report(data: Dict[str, Any], time_str: str) -> str:
+    """Generate HTML email report"""
+    ctx = report_context(data, time_str)
+    ctx["btc_change_class"] = "change-pos" if ctx["btc_change_24h"] >= 0 else "change-neg"
+    ctx["eth_change_class"] = "change-pos" if ctx["eth_change_24h"] >= 0 else "change-neg"
+    return EMAIL_TEMPLATE.format_map(ctx)
 
 
 # ============================================
@@ -638,7 +758,7 @@ def generate_email_report(data: Dict[str, Any]) -> str:
 def send_telegram(message: str) -> bool:
     """Send via Telegram"""
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        print("⚠️ Telegram not configured")
+        log.warning("⚠️ Telegram not configured")
         return False
     
     try:
@@ -649,42 +769,45 @@ def send_telegram(message: str) -> bool:
             "parse_mode": "Markdown",
             "disable_web_page_preview": True,
         }
-        response = requests.post(url, json=payload, timeout=15)
-        if response.status_code == 200:
-            print("✅ Telegram sent")
-            return True
-        else:
-            print(f"❌ Telegram failed: {response.text}")
+        # Only the status matters on success, so don't read the body
+        with httpx.stream("POST", url, json=payload, timeout=HTTP_TIMEOUT) as response:
+            if response.status_code == 200:
+                log.info("✅ Telegram sent")
+                return True
+            else:
+                response.read()
+                log.error(f"❌ Telegram failed: {response.text}")
     except Exception as e:
-        print(f"❌ Telegram error: {e}")
+        log.error(f"❌ Telegram error: {e}")
     return False
 
 
-def send_email(html_content: str) -> bool:
+def send_email(html_content: str, time_str: str) -> bool:
     """Send via Outlook email"""
     if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
-        print("⚠️ Email not configured")
+        log.warning("⚠️ Email not configured")
         return False
     
+    # Only loaded when email is configured
+    import smtplib
+    from email.message import EmailMessage
+    
     try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"📊 Crypto Dashboard - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        msg = EmailMessage()
+        msg["Subject"] = f"📊 Crypto Dashboard - {time_str}"
         msg["From"] = EMAIL_ADDRESS
         msg["To"] = EMAIL_ADDRESS
+        msg.set_content(html_content, subtype="html")
         
-        html_part = MIMEText(html_content, "html")
-        msg.attach(html_part)
-        
-        # Gmail SMTP
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
+        # Gmail SMTP over implicit TLS: no plaintext greeting + STARTTLS round trip
+        with smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=15) as server:
             server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-            server.sendmail(EMAIL_ADDRESS, EMAIL_ADDRESS, msg.as_string())
+            server.send_message(msg)
         
-        print("✅ Email sent")
+        log.info("✅ Email sent")
         return True
     except Exception as e:
-        print(f"❌ Email error: {e}")
+        log.error(f"❌ Email error: {e}")
     return False
 
 
@@ -692,61 +815,74 @@ def send_email(html_content: str) -> bool:
 # MAIN
 # ============================================
 
+@dataclass(slots=True)
+class Snapshot:
+    """One run's record, as saved to data/latest.json"""
+    timestamp: str
+    data: Dict[str, Any]
+
+
+def save_latest(data: Dict[str, Any]) -> None:
+    """Write this run's snapshot to data/latest.json (atomically, via a temp file)"""
+    os.makedirs("data", exist_ok=True)
+    tmp = "data/latest.json.tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(Snapshot(datetime.now().isoformat(), data), option=orjson.OPT_INDENT_2))
+    os.replace(tmp, "data/latest.json")
+
+
+async def publish(telegram_report: str, email_report: str, data: Dict[str, Any], time_str: str) -> None:
+    """Send both reports and save the snapshot, overlapping the blocking I/O"""
+    await asyncio.gather(
+        asyncio.to_thread(send_telegram, telegram_report),
+        asyncio.to_thread(send_email, email_report, time_str),
+        asyncio.to_thread(save_latest, data),
+    )
+
+
 def main():
-    print("🚀 Crypto Dashboard v5 starting...")
-    print("=" * 40)
-    
-    data = {}
-    
-    print("📊 BTC...")
-    data["btc"] = get_btc_detailed()
-    time.sleep(2)
-    
-    print("📊 ETH...")
-    data["eth"] = get_eth_detailed()
-    time.sleep(2)
-    
-    print("📊 Fear & Greed...")
-    data["fear_greed"] = get_fear_greed_index()
-    time.sleep(1)
-    
-    print("📊 US M2...")
-    data["m2_supply"] = get_us_m2_supply()
-    time.sleep(1)
-    
-    print("📊 Funding Rate...")
-    data["funding_rate"] = get_funding_rate()
-    time.sleep(1)
-    
-    print("📊 Kimchi Premium...")
-    data["kimchi_premium"] = get_kimchi_premium()
-    time.sleep(1)
+    # One stdout write at the end instead of one per progress line
+    buffer = io.StringIO()
+    handler = logging.StreamHandler(buffer)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    try:
+        run()
+    finally:
+        log.removeHandler(handler)
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+
+
+def run():
+    log.info("🚀 Crypto Dashboard v5 starting...")
     
-    print("📊 Dominance...")
-    data["dominance"] = get_btc_dominance()
-    time.sleep(1)
+    # Nobody would receive the report: skip every API call (--dry-run forces a run)
+    telegram_ready = TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID
+    email_ready = EMAIL_ADDRESS and EMAIL_PASSWORD
+    if not (telegram_ready or email_ready or "--dry-run" in sys.argv):
+        log.warning("⚠️ Neither Telegram nor email is configured, exiting (use --dry-run to run anyway)")
+        return
     
-    print("📊 Stablecoin...")
-    data["stablecoin"] = get_stablecoin_supply()
+    log.info("=" * 40)
     
-    print("=" * 40)
+    data = asyncio.run(collect_all())
     
-    # Generate reports
-    telegram_report = generate_report(data)
-    email_report = generate_email_report(data)
+    log.info("=" * 40)
     
-    print("\n" + telegram_report)
+    # Generate reports, all stamped with the same Berlin wall-clock time
+    time_str = datetime.now(REPORT_TZ).strftime("%Y-%m-%d %H:%M %Z")
+    telegram_report = generate_report(data, time_str)
+    email_report = generate_email_report(data, time_str)
     
-    # Send
-    send_telegram(telegram_report)
-    send_email(email_report)
+    log.info("\n" + telegram_report)
     
-    # Save
-    os.makedirs("data", exist_ok=True)
-    with open("data/latest.json", "w", encoding="utf-8") as f:
-        json.dump({"timestamp": datetime.now().isoformat(), "data": data}, f, ensure_ascii=False, indent=2)
+    # Send + save
+    asyncio.run(publish(telegram_report, email_report, data, time_str))
     
-    print("\n✅ Done!")
+    log.info("\n✅ Done!")
 
 
 if __name__ == "__main__":